@@ -1,8 +1,9 @@
 import streamlit as st
 import os
+import json
 from dotenv import load_dotenv
 from utils.stt_engine import transcribe_audio
-from utils.llm_engine import generate_content
+from utils.llm_engine import generate_content, extract_items, merge_new_items, parse_json_content
 
 # Load environment variables
 load_dotenv()
@@ -301,15 +302,7 @@ if 'transcription' in st.session_state:
             with st.spinner("Generating Quiz..."):
                 try:
                     quiz_json = generate_content(st.session_state.transcription, 'quiz', groq_api_key)
-                    import json
-                    # Try to parse JSON, handle potential markdown wrapping
-                    quiz_json_clean = quiz_json.strip()
-                    if quiz_json_clean.startswith("```"):
-                        # Remove markdown code blocks
-                        lines = quiz_json_clean.split('\n')
-                        quiz_json_clean = '\n'.join([l for l in lines if not l.startswith('```')])
-                    
-                    quiz_data = json.loads(quiz_json_clean)
+                    quiz_data = parse_json_content(quiz_json)
                     st.session_state.quiz_data = quiz_data
                     st.session_state.quiz_answers = {}
                     st.session_state.quiz_submitted = False
@@ -320,6 +313,33 @@ if 'transcription' in st.session_state:
                     st.error(f"Failed to generate quiz: {e}")
         
         if 'quiz_data' in st.session_state:
+            more_col1, more_col2 = st.columns([1, 3])
+            with more_col1:
+                more_quiz_count = st.number_input("New questions", min_value=1, max_value=10, value=5, key="more_quiz_count")
+            with more_col2:
+                st.markdown("")
+                generate_more_quiz = st.button("➕ Generate More Questions", key="generate_more_quiz_button")
+            if generate_more_quiz:
+                with st.spinner("Generating More Questions..."):
+                    try:
+                        existing_questions = st.session_state.quiz_data['questions']
+                        quiz_json = generate_content(
+                            st.session_state.transcription, 'quiz', groq_api_key,
+                            count=more_quiz_count, existing_items=existing_questions
+                        )
+                        new_questions = merge_new_items(existing_questions, extract_items(parse_json_content(quiz_json), 'quiz'), 'quiz')
+                        if new_questions:
+                            existing_questions.extend(new_questions)
+                            # Let the user answer the newly added questions
+                            st.session_state.quiz_submitted = False
+                            st.success(f"Added {len(new_questions)} new question(s)!")
+                        else:
+                            st.warning("No new questions were generated. Please try again.")
+                    except (json.JSONDecodeError, ValueError) as e:
+                        st.error(f"Failed to parse quiz data. Please try again. Error: {e}")
+                    except Exception as e:
+                        st.error(f"Failed to generate more questions: {e}")
+
             quiz_data = st.session_state.quiz_data
             
             if not st.session_state.get('quiz_submitted', False):
@@ -397,15 +417,7 @@ if 'transcription' in st.session_state:
             with st.spinner("Generating Flashcards..."):
                 try:
                     flashcards_json = generate_content(st.session_state.transcription, 'flashcards', groq_api_key)
-                    import json
-                    # Try to parse JSON, handle potential markdown wrapping
-                    flashcards_json_clean = flashcards_json.strip()
-                    if flashcards_json_clean.startswith("```"):
-                        # Remove markdown code blocks
-                        lines = flashcards_json_clean.split('\n')
-                        flashcards_json_clean = '\n'.join([l for l in lines if not l.startswith('```')])
-                    
-                    flashcards_data = json.loads(flashcards_json_clean)
+                    flashcards_data = parse_json_content(flashcards_json)
                     st.session_state.flashcards_data = flashcards_data
                     st.session_state.current_card = 0
                     st.session_state.show_back = False
@@ -416,6 +428,31 @@ if 'transcription' in st.session_state:
                     st.error(f"Failed to generate flashcards: {e}")
         
         if 'flashcards_data' in st.session_state:
+            more_col1, more_col2 = st.columns([1, 3])
+            with more_col1:
+                more_cards_count = st.number_input("New flashcards", min_value=1, max_value=10, value=5, key="more_cards_count")
+            with more_col2:
+                st.markdown("")
+                generate_more_cards = st.button("➕ Generate More Flashcards", key="generate_more_flashcards_button")
+            if generate_more_cards:
+                with st.spinner("Generating More Flashcards..."):
+                    try:
+                        existing_cards = st.session_state.flashcards_data['flashcards']
+                        flashcards_json = generate_content(
+                            st.session_state.transcription, 'flashcards', groq_api_key,
+                            count=more_cards_count, existing_items=existing_cards
+                        )
+                        new_cards = merge_new_items(existing_cards, extract_items(parse_json_content(flashcards_json), 'flashcards'), 'flashcards')
+                        if new_cards:
+                            existing_cards.extend(new_cards)
+                            st.success(f"Added {len(new_cards)} new flashcard(s)!")
+                        else:
+                            st.warning("No new flashcards were generated. Please try again.")
+                    except (json.JSONDecodeError, ValueError) as e:
+                        st.error(f"Failed to parse flashcard data. Please try again. Error: {e}")
+                    except Exception as e:
+                        st.error(f"Failed to generate more flashcards: {e}")
+
             flashcards = st.session_state.flashcards_data['flashcards']
             current_idx = st.session_state.get('current_card', 0)
             show_back = st.session_state.get('show_back', False)
@@ -1,6 +1,122 @@
+import hashlib
+import json
+import re
+import unicodedata
+
 from groq import Groq
 
-def generate_content(text, prompt_type, api_key):
+# Response container and identifying field for each generated item type
+ITEM_KEYS = {
+    'quiz': ('questions', 'question'),
+    'flashcards': ('flashcards', 'front'),
+}
+
+def normalize_text(text):
+    """
+    Normalizes text for prompting (casefolded, no accents or punctuation, single spaces).
+    """
+    text = unicodedata.normalize('NFKD', str(text).casefold())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+def dedup_key(text):
+    """
+    Returns the text used to compare items (casefolded, NFKC, single spaces,
+    trailing punctuation trimmed). Symbols are kept so 'C++' and 'C#' stay distinct.
+    """
+    text = unicodedata.normalize('NFKC', str(text).casefold())
+    return ' '.join(text.split()).rstrip('?.!:;, ')
+
+def is_valid_item(item, prompt_type):
+    """
+    Checks that a generated quiz question or flashcard has the shape the UI expects.
+    """
+    if not isinstance(item, dict):
+        return False
+    _, field = ITEM_KEYS[prompt_type]
+    if not isinstance(item.get(field), str) or not dedup_key(item[field]):
+        return False
+    if prompt_type == 'quiz':
+        options = item.get('options')
+        correct = item.get('correct')
+        return (
+            isinstance(options, list) and len(options) > 0
+            and isinstance(correct, int) and not isinstance(correct, bool)
+            and 0 <= correct < len(options)
+        )
+    return isinstance(item.get('back'), str)
+
+def item_hash(text):
+    """
+    Returns a short hash of the dedup key of a quiz question or flashcard.
+    """
+    return hashlib.sha1(dedup_key(text).encode('utf-8')).hexdigest()[:16]
+
+def extract_items(data, prompt_type):
+    """
+    Returns the list of quiz questions or flashcards from a parsed model response.
+    
+    Raises:
+        ValueError: If the response is not a JSON object holding a list of items.
+    """
+    container, _ = ITEM_KEYS[prompt_type]
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object with '{container}', got {type(data).__name__}.")
+    items = data.get(container, [])
+    if not isinstance(items, list):
+        raise ValueError(f"Expected '{container}' to be a list, got {type(items).__name__}.")
+    return items
+
+def build_fingerprint(items, prompt_type, max_words=8):
+    """
+    Builds a compact list of existing items so the model can avoid repeating them.
+    
+    Only the first few normalized words of each question/front are kept to
+    keep the prompt small.
+    """
+    _, field = ITEM_KEYS[prompt_type]
+    lines = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        words = normalize_text(item.get(field, '')).split()
+        if words:
+            lines.append('- ' + ' '.join(words[:max_words]))
+    return '\n'.join(lines)
+
+def merge_new_items(existing_items, new_items, prompt_type):
+    """
+    Returns the valid items from new_items that are not already present.
+    
+    Malformed items are dropped first. Remaining items are compared by the hash
+    of their question/front text, both against the existing set and against each other.
+    """
+    _, field = ITEM_KEYS[prompt_type]
+    seen = {item_hash(item.get(field, '')) for item in existing_items if isinstance(item, dict)}
+    unique_items = []
+    for item in new_items:
+        if not is_valid_item(item, prompt_type):
+            continue
+        key = item_hash(item[field])
+        if key in seen:
+            continue
+        seen.add(key)
+        unique_items.append(item)
+    return unique_items
+
+def parse_json_content(content):
+    """
+    Parses a JSON response from the model, handling potential markdown wrapping.
+    """
+    content_clean = content.strip()
+    if content_clean.startswith("```"):
+        # Remove markdown code blocks
+        lines = content_clean.split('\n')
+        content_clean = '\n'.join([l for l in lines if not l.startswith('```')])
+    return json.loads(content_clean)
+
+def generate_content(text, prompt_type, api_key, count=10, existing_items=None):
     """
     Generates content (notes, quiz, flashcards) using Groq API.
     
@@ -8,13 +124,25 @@ def generate_content(text, prompt_type, api_key):
         text (str): Input text (transcribed lecture).
         prompt_type (str): Type of content to generate ('summary', 'quiz', 'flashcards').
         api_key (str): Groq API Key.
+        count (int): Number of quiz questions or flashcards to generate.
+        existing_items (list): Existing quiz questions or flashcards to avoid repeating.
         
     Returns:
         str: Generated content.
+        
+    Raises:
+        RuntimeError: If the Groq API request fails.
     """
     if not api_key:
         raise ValueError("Groq API Key is missing.")
 
+    avoid_section = ""
+    if existing_items and prompt_type in ITEM_KEYS:
+        avoid_section = f"""
+                Do NOT repeat or rephrase any of these existing items (shown as normalized prefixes):
+                {build_fingerprint(existing_items, prompt_type)}
+                """
+
     try:
         client = Groq(api_key=api_key)
         # Using llama-3.3-70b-versatile for high-quality content generation
@@ -45,7 +173,7 @@ def generate_content(text, prompt_type, api_key):
                 {text}
             """,
             'quiz': f"""
-                Create a 10-question multiple-choice quiz based on the lecture transcript.
+                Create a {count}-question multiple-choice quiz based on the lecture transcript.
                 
                 IMPORTANT: You MUST respond with ONLY valid JSON in this exact format (no markdown, no code blocks):
                 {{
@@ -62,13 +190,14 @@ def generate_content(text, prompt_type, api_key):
                 - "correct" is the index (0-3) of the correct option
                 - Focus on key concepts, not trivial details
                 - Make options clear and distinct
-                - Ensure exactly 10 questions
+                - Ensure exactly {count} questions
+                {avoid_section}
                 
                 Transcript:
                 {text}
             """,
             'flashcards': f"""
-                Create 10 high-quality flashcards from the lecture transcript.
+                Create {count} high-quality flashcards from the lecture transcript.
                 
                 IMPORTANT: You MUST respond with ONLY valid JSON in this exact format (no markdown, no code blocks):
                 {{
@@ -84,7 +213,8 @@ def generate_content(text, prompt_type, api_key):
                 - Focus on key terms, definitions, and important concepts
                 - Keep front concise (concept/term/question)
                 - Make back comprehensive but clear
-                - Ensure exactly 10 flashcards
+                - Ensure exactly {count} flashcards
+                {avoid_section}
                 
                 Transcript:
                 {text}
@@ -105,4 +235,4 @@ def generate_content(text, prompt_type, api_key):
         )
         return response.choices[0].message.content
     except Exception as e:
-        return f"Error generating content: {str(e)}"
+        raise RuntimeError(f"Error generating content: {str(e)}") from e